@@ -5,11 +5,13 @@ Aplicação Streamlit com análise avançada usando Pandas
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import sys
 import os
+import warnings
 
 # Adicionar src ao path
 src_path = os.path.join(os.path.dirname(__file__), 'src')
@@ -19,6 +21,7 @@ if src_path not in sys.path:
 try:
     from data_processor import DataProcessor
     from visualizations import Visualizations
+    from data_generator import formatar_identificadores
 except ImportError as e:
     st.error(f"Erro ao importar módulos: {e}")
     st.stop()
@@ -50,17 +53,68 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
+@st.cache_resource
 def carregar_dados():
-    """Carrega os dados do CSV ou gera automaticamente se não existir"""
+    """
+    Carrega os dados salvos ou gera automaticamente se não existirem
+    
+    O DataFrame é compartilhado entre execuções sem cópia e deve ser
+    tratado como somente leitura.
+    """
     import os
     
     # Obter o diretório base do arquivo app.py
     base_dir = os.path.dirname(os.path.abspath(__file__))
-    caminho_dados = os.path.join(base_dir, 'data', 'vendas.csv')
+    caminho_dados = os.path.join(base_dir, 'data', 'vendas.parquet')
+    caminho_csv = os.path.join(base_dir, 'data', 'vendas.csv')
     
-    # Verificar se o arquivo existe
-    if not os.path.exists(caminho_dados):
+    if os.path.exists(caminho_dados):
+        # Parquet preserva os tipos: sem parse de datas nem conversão para category
+        try:
+            df = pd.read_parquet(caminho_dados, engine='pyarrow')
+        except Exception as e:
+            st.error(f"Erro ao carregar dados: {e}")
+            st.stop()
+    elif os.path.exists(caminho_csv):
+        # Compatibilidade com dados salvos em CSV por versões anteriores
+        try:
+            from data_generator import (COLUNAS_CATEGORICAS, COLUNAS_DERIVADAS, TIPOS_NUMERICOS,
+                                        converter_identificadores, remover_colunas_derivadas)
+            try:
+                import pyarrow as pa
+                import pyarrow.csv as pacsv
+            except ImportError:
+                pacsv = None
+            
+            if pacsv is not None:
+                # Leitor CSV do PyArrow: lê em blocos de 8 MB e converte cada coluna
+                # direto para o tipo final (dicionário -> category), sem DataFrame intermediário
+                tipos = {
+                    'Data': pa.timestamp('ns'),
+                    **{coluna: pa.dictionary(pa.int32(), pa.string()) for coluna in COLUNAS_CATEGORICAS},
+                    **{coluna: pa.from_numpy_dtype(tipo) for coluna, tipo in TIPOS_NUMERICOS.items()}
+                }
+                tabela = pacsv.read_csv(
+                    caminho_csv,
+                    read_options=pacsv.ReadOptions(block_size=8 << 20),
+                    convert_options=pacsv.ConvertOptions(column_types=tipos)
+                )
+                # Colunas derivadas descartadas ainda no Arrow, sem convertê-las
+                tabela = tabela.drop_columns([c for c in COLUNAS_DERIVADAS if c in tabela.column_names])
+                df = tabela.to_pandas(split_blocks=True, self_destruct=True)
+                del tabela
+            else:
+                df = pd.read_csv(
+                    caminho_csv,
+                    parse_dates=['Data'],
+                    dtype={**TIPOS_NUMERICOS, **{coluna: 'category' for coluna in COLUNAS_CATEGORICAS}}
+                )
+                df = remover_colunas_derivadas(df)
+            converter_identificadores(df)
+        except Exception as e:
+            st.error(f"Erro ao carregar dados: {e}")
+            st.stop()
+    else:
         # Gerar dados automaticamente
         with st.spinner('Gerando dados de exemplo... Isso pode levar alguns segundos.'):
             try:
@@ -73,16 +127,95 @@ def carregar_dados():
             except Exception as e:
                 st.error(f"Erro ao gerar dados: {e}")
                 st.stop()
-    else:
-        # Carregar dados existentes
-        try:
-            df = pd.read_csv(caminho_dados, parse_dates=['Data'])
-        except Exception as e:
-            st.error(f"Erro ao carregar dados: {e}")
-            st.stop()
+    
+    # Dados ordenados por data permitem filtrar o período por busca binária
+    if not df['Data'].is_monotonic_increasing:
+        df = df.sort_values('Data', ignore_index=True)
     
     return df
 
+@st.cache_resource(max_entries=32, ttl=3600)
+def obter_processador(filtros):
+    """
+    Retorna um DataProcessor com os filtros aplicados
+    
+    Args:
+        filtros: Tupla (data_inicio, data_fim, status, categorias, regiões)
+    """
+    data_inicio, data_fim, status, categorias, regioes = filtros
+    
+    # carregar_dados entrega as datas já ordenadas
+    processor = DataProcessor(carregar_dados(), datas_ordenadas=True)
+    processor.filtrar_por_periodo(data_inicio, data_fim)
+    processor.filtrar_por_status(list(status))
+    processor.filtrar_por_categoria(list(categorias))
+    processor.filtrar_por_regiao(list(regioes))
+    
+    return processor
+
+@st.cache_data(max_entries=256, ttl=3600)
+def analise_filtrada(filtros, metodo, **parametros):
+    """
+    Executa um método de análise do DataProcessor, com cache por estado dos filtros
+    
+    Args:
+        filtros: Tupla retornada pela assinatura dos filtros em main()
+        metodo: Nome do método do DataProcessor (ex.: 'analise_por_categoria')
+        **parametros: Argumentos repassados ao método
+    """
+    return getattr(obter_processador(filtros), metodo)(**parametros)
+
+@st.cache_resource(max_entries=256, ttl=3600)
+def grafico_filtrado(filtros, metodo, **parametros):
+    """
+    Gera um gráfico de Visualizations, com cache por estado dos filtros
+    
+    Trocar de aba sem mudar os filtros reaproveita a figura já construída.
+    A figura é compartilhada sem cópia (cache_resource): quem a recebe
+    apenas a exibe, nunca a altera.
+    
+    Args:
+        filtros: Tupla retornada pela assinatura dos filtros em main()
+        metodo: Nome do método de Visualizations (ex.: 'grafico_pizza_categorias')
+        **parametros: Argumentos repassados ao método
+    """
+    # .df (sem cópia): o mesmo objeto em todos os gráficos mantém o cache de
+    # vendas concluídas de visualizations compartilhado entre eles
+    df_filtrado = Visualizations.preparar(obter_processador(filtros).df)
+    return getattr(Visualizations, metodo)(df_filtrado, **parametros)
+
+@st.cache_data(max_entries=32)
+def estatisticas_descritivas(_df, filtros):
+    """
+    Estatísticas descritivas das colunas numéricas, no mesmo formato de describe()
+    
+    Os percentis de todas as colunas saem de uma única chamada ao NumPy.
+    O cache é indexado pela assinatura dos filtros (o DataFrame não é hasheado).
+    """
+    if len(_df) == 0:
+        return _df.describe()
+    
+    valores = _df.to_numpy(dtype=np.float64)
+    
+    # Uma linha (std com ddof=1) ou coluna toda NaN resultam em NaN, como em
+    # describe(), sem os RuntimeWarning que o NumPy emite nesses casos
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        estatisticas = np.vstack([
+            np.count_nonzero(~np.isnan(valores), axis=0),
+            np.nanmean(valores, axis=0),
+            np.nanstd(valores, axis=0, ddof=1),
+            np.nanmin(valores, axis=0),
+            np.nanpercentile(valores, [25, 50, 75], axis=0),
+            np.nanmax(valores, axis=0)
+        ])
+    
+    return pd.DataFrame(
+        estatisticas,
+        index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+        columns=_df.columns
+    )
+
 def main():
     """Função principal do dashboard"""
     
@@ -142,19 +275,25 @@ def main():
         default=regioes
     )
     
-    # Aplicar filtros
-    processor = DataProcessor(df_original)
-    processor.filtrar_por_periodo(data_inicio, data_fim)
-    processor.filtrar_por_status(status_selecionados)
-    processor.filtrar_por_categoria(categorias_selecionadas)
-    processor.filtrar_por_regiao(regioes_selecionadas)
+    # Assinatura dos filtros, usada como chave de cache
+    filtros = (
+        data_inicio, data_fim, tuple(sorted(status_selecionados)),
+        tuple(sorted(categorias_selecionadas)), tuple(sorted(regioes_selecionadas))
+    )
     
+    # Aplicar filtros
+    processor = obter_processador(filtros)
     df_filtrado = processor.get_dataframe()
     
+    # Sem registros: nenhuma análise ou gráfico a montar
+    if len(df_filtrado) == 0:
+        st.warning("Nenhum registro corresponde aos filtros selecionados.")
+        st.stop()
+    
     # Métricas principais
     st.header("📈 Métricas Principais")
     
-    metricas = processor.calcular_metricas_vendas()
+    metricas = analise_filtrada(filtros, 'calcular_metricas_vendas')
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -230,17 +369,16 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            viz = Visualizations()
-            fig_temporal = viz.grafico_receita_temporal(df_filtrado, periodo='M')
+            fig_temporal = grafico_filtrado(filtros, 'grafico_receita_temporal', periodo='M')
             st.plotly_chart(fig_temporal, use_container_width=True)
         
         with col2:
-            fig_tendencia = viz.grafico_tendencia_mensal(df_filtrado)
+            fig_tendencia = grafico_filtrado(filtros, 'grafico_tendencia_mensal')
             st.plotly_chart(fig_tendencia, use_container_width=True)
         
         # Tabela de análise temporal
         st.subheader("Resumo Mensal")
-        analise_temporal = processor.analise_temporal(periodo='M')
+        analise_temporal = analise_filtrada(filtros, 'analise_temporal', periodo='M')
         st.dataframe(analise_temporal, use_container_width=True)
     
     with tab2:
@@ -249,16 +387,16 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_categoria = viz.grafico_receita_por_categoria(df_filtrado)
+            fig_categoria = grafico_filtrado(filtros, 'grafico_receita_por_categoria')
             st.plotly_chart(fig_categoria, use_container_width=True)
         
         with col2:
-            fig_pizza = viz.grafico_pizza_categorias(df_filtrado)
+            fig_pizza = grafico_filtrado(filtros, 'grafico_pizza_categorias')
             st.plotly_chart(fig_pizza, use_container_width=True)
         
         # Tabela de análise por categoria
         st.subheader("Detalhamento por Categoria")
-        analise_categoria = processor.analise_por_categoria()
+        analise_categoria = analise_filtrada(filtros, 'analise_por_categoria')
         st.dataframe(analise_categoria, use_container_width=True)
     
     with tab3:
@@ -267,16 +405,16 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_regiao = viz.grafico_receita_por_regiao(df_filtrado)
+            fig_regiao = grafico_filtrado(filtros, 'grafico_receita_por_regiao')
             st.plotly_chart(fig_regiao, use_container_width=True)
         
         with col2:
-            fig_heatmap = viz.mapa_calor_vendas(df_filtrado)
+            fig_heatmap = grafico_filtrado(filtros, 'mapa_calor_vendas')
             st.plotly_chart(fig_heatmap, use_container_width=True)
         
         # Tabela de análise por região
         st.subheader("Detalhamento por Região")
-        analise_regiao = processor.analise_por_regiao()
+        analise_regiao = analise_filtrada(filtros, 'analise_por_regiao')
         st.dataframe(analise_regiao, use_container_width=True)
     
     with tab4:
@@ -284,12 +422,12 @@ def main():
         
         n_vendedores = st.slider("Número de vendedores a exibir", 5, 20, 10)
         
-        fig_vendedores = viz.grafico_top_vendedores(df_filtrado, n=n_vendedores)
+        fig_vendedores = grafico_filtrado(filtros, 'grafico_top_vendedores', n=n_vendedores)
         st.plotly_chart(fig_vendedores, use_container_width=True)
         
         # Tabela de top vendedores
         st.subheader(f"Top {n_vendedores} Vendedores")
-        top_vendedores = processor.top_vendedores(n=n_vendedores)
+        top_vendedores = analise_filtrada(filtros, 'top_vendedores', n=n_vendedores)
         st.dataframe(top_vendedores, use_container_width=True)
     
     with tab5:
@@ -298,16 +436,16 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_pagamento = viz.grafico_metodo_pagamento(df_filtrado)
+            fig_pagamento = grafico_filtrado(filtros, 'grafico_metodo_pagamento')
             st.plotly_chart(fig_pagamento, use_container_width=True)
         
         with col2:
-            fig_status = viz.grafico_vendas_por_status(df_filtrado)
+            fig_status = grafico_filtrado(filtros, 'grafico_vendas_por_status')
             st.plotly_chart(fig_status, use_container_width=True)
         
         # Tabela de métodos de pagamento
         st.subheader("Detalhamento por Método de Pagamento")
-        analise_pagamento = processor.analise_metodo_pagamento()
+        analise_pagamento = analise_filtrada(filtros, 'analise_metodo_pagamento')
         st.dataframe(analise_pagamento, use_container_width=True)
     
     st.divider()
@@ -331,8 +469,9 @@ def main():
         n_linhas = st.slider("Número de linhas", 10, 1000, 100)
     
     if colunas_selecionadas:
+        # Identificadores formatados apenas nas linhas exibidas
         st.dataframe(
-            df_filtrado[colunas_selecionadas].head(n_linhas),
+            formatar_identificadores(df_filtrado[colunas_selecionadas].head(n_linhas)),
             use_container_width=True,
             height=400
         )
@@ -340,15 +479,19 @@ def main():
     # Estatísticas descritivas
     st.subheader("📊 Estatísticas Descritivas")
     
-    col_numericas = df_filtrado.select_dtypes(include=['float64', 'int64']).columns.tolist()
+    # Colunas numéricas de medida (identificadores ficam de fora)
+    col_numericas = df_filtrado.select_dtypes(include='number').columns.difference(
+        ['Vendedor_ID', 'Cliente_ID_Num'], sort=False
+    ).tolist()
     if col_numericas:
-        st.dataframe(df_filtrado[col_numericas].describe(), use_container_width=True)
+        st.dataframe(estatisticas_descritivas(df_filtrado[col_numericas], filtros),
+                     use_container_width=True)
     
     # Tendências
     st.divider()
     st.header("📈 Tendências e Insights")
     
-    tendencias = processor.tendencias()
+    tendencias = analise_filtrada(filtros, 'tendencias')
     
     if tendencias:
         col1, col2, col3 = st.columns(3)
@@ -6,7 +6,16 @@ Gera dados realistas de vendas/negócios
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
+
+# Colunas de texto com baixa cardinalidade, armazenadas como category
+COLUNAS_CATEGORICAS = ['Status', 'Categoria', 'Região', 'Cidade', 'Método_Pagamento']
+
+# Colunas inteiras de faixa pequena, armazenadas em tipos compactos
+TIPOS_NUMERICOS = {'Quantidade': np.int8, 'Desconto_%': np.int8}
+
+# Colunas derivadas de 'Data' presentes no CSV legado; hoje são
+# calculadas sob demanda pelo DataProcessor e não são mais armazenadas
+COLUNAS_DERIVADAS = ['Mês', 'Ano', 'Trimestre', 'Dia_Semana', 'Mês_Nome']
 
 def gerar_dados_vendas(n_registros=1000, seed=42):
     """
@@ -20,7 +29,6 @@ def gerar_dados_vendas(n_registros=1000, seed=42):
         DataFrame com dados de vendas
     """
     np.random.seed(seed)
-    random.seed(seed)
     
     # Categorias de produtos
     categorias = ['Eletrônicos', 'Roupas', 'Casa e Jardim', 'Esportes', 
@@ -38,80 +46,139 @@ def gerar_dados_vendas(n_registros=1000, seed=42):
         'Sul': ['Curitiba', 'Porto Alegre', 'Florianópolis']
     }
     
-    # Gerar datas (últimos 12 meses)
-    data_inicio = datetime.now() - timedelta(days=365)
-    datas = [data_inicio + timedelta(days=x) for x in range(n_registros)]
-    datas = sorted(random.sample(datas, n_registros))
-    
-    # Gerar dados
-    dados = []
-    for i in range(n_registros):
-        categoria = np.random.choice(categorias)
-        regiao = np.random.choice(regioes)
-        cidade = np.random.choice(cidades[regiao])
-        
-        # Preços variam por categoria
-        precos_base = {
-            'Eletrônicos': (500, 5000),
-            'Roupas': (50, 500),
-            'Casa e Jardim': (30, 800),
-            'Esportes': (100, 1500),
-            'Livros': (20, 150),
-            'Brinquedos': (25, 400),
-            'Alimentos': (10, 200),
-            'Beleza': (15, 300)
-        }
-        
-        preco_min, preco_max = precos_base[categoria]
-        valor = round(np.random.uniform(preco_min, preco_max), 2)
-        quantidade = np.random.randint(1, 10)
-        total = round(valor * quantidade, 2)
-        
-        # Desconto aleatório (0-30%)
-        desconto = np.random.choice([0, 5, 10, 15, 20, 25, 30], p=[0.3, 0.2, 0.15, 0.15, 0.1, 0.05, 0.05])
-        valor_final = round(total * (1 - desconto/100), 2)
-        
-        # Status da venda
-        status = np.random.choice(['Concluída', 'Pendente', 'Cancelada'], p=[0.85, 0.1, 0.05])
-        
-        # Método de pagamento
-        metodo_pagamento = np.random.choice(['Cartão Crédito', 'Cartão Débito', 'PIX', 'Boleto'], 
-                                           p=[0.4, 0.2, 0.3, 0.1])
-        
-        dados.append({
-            'ID': f'V{i+1:05d}',
-            'Data': datas[i],
-            'Categoria': categoria,
-            'Produto': f'Produto {categoria} {i+1}',
-            'Região': regiao,
-            'Cidade': cidade,
-            'Valor_Unitário': valor,
-            'Quantidade': quantidade,
-            'Valor_Total': total,
-            'Desconto_%': desconto,
-            'Valor_Final': valor_final,
-            'Status': status,
-            'Método_Pagamento': metodo_pagamento,
-            'Vendedor': f'Vendedor {np.random.randint(1, 21)}',
-            'Cliente_ID': f'C{np.random.randint(1000, 9999)}'
-        })
-    
-    df = pd.DataFrame(dados)
-    
-    # Adicionar colunas derivadas
-    df['Mês'] = df['Data'].dt.to_period('M')
-    df['Ano'] = df['Data'].dt.year
-    df['Trimestre'] = df['Data'].dt.quarter
-    df['Dia_Semana'] = df['Data'].dt.day_name()
-    df['Mês_Nome'] = df['Data'].dt.strftime('%B')
+    # Gerar datas (últimos 12 meses), já ordenadas e no tipo final da coluna
+    data_inicio = np.datetime64(datetime.now() - timedelta(days=365), 'D')
+    deslocamentos = np.random.randint(0, 365, n_registros, dtype=np.int32)
+    deslocamentos.sort()
+    datas = (data_inicio + deslocamentos).astype('datetime64[ns]')
+    
+    # Preços variam por categoria
+    precos_base = {
+        'Eletrônicos': (500, 5000),
+        'Roupas': (50, 500),
+        'Casa e Jardim': (30, 800),
+        'Esportes': (100, 1500),
+        'Livros': (20, 150),
+        'Brinquedos': (25, 400),
+        'Alimentos': (10, 200),
+        'Beleza': (15, 300)
+    }
+    
+    # Gerar dados (uma chamada vetorizada por coluna, sem loop por registro)
+    idx_categoria = np.random.randint(0, len(categorias), n_registros)
+    idx_regiao = np.random.randint(0, len(regioes), n_registros)
+    
+    # Cidade sorteada dentro da região, indexando uma lista achatada de cidades
+    cidades_por_regiao = np.array([len(cidades[r]) for r in regioes])
+    inicio_regiao = np.concatenate(([0], np.cumsum(cidades_por_regiao)[:-1]))
+    idx_cidade = inicio_regiao[idx_regiao] + np.random.randint(0, cidades_por_regiao[idx_regiao])
+    todas_cidades = np.array([c for r in regioes for c in cidades[r]])
+    
+    preco_min = np.array([precos_base[c][0] for c in categorias])[idx_categoria]
+    preco_max = np.array([precos_base[c][1] for c in categorias])[idx_categoria]
+    valor = np.round(np.random.uniform(preco_min, preco_max), 2)
+    quantidade = np.random.randint(1, 10, n_registros)
+    total = np.round(valor * quantidade, 2)
+    
+    # Desconto aleatório (0-30%)
+    desconto = np.random.choice([0, 5, 10, 15, 20, 25, 30], size=n_registros,
+                                p=[0.3, 0.2, 0.15, 0.15, 0.1, 0.05, 0.05])
+    valor_final = np.round(total * (1 - desconto / 100), 2)
+    
+    # Status da venda
+    status = ['Concluída', 'Pendente', 'Cancelada']
+    idx_status = np.random.choice(len(status), size=n_registros, p=[0.85, 0.1, 0.05])
+    
+    # Método de pagamento
+    metodos_pagamento = ['Cartão Crédito', 'Cartão Débito', 'PIX', 'Boleto']
+    idx_metodo = np.random.choice(len(metodos_pagamento), size=n_registros, p=[0.4, 0.2, 0.3, 0.1])
+    
+    # Identificadores numéricos (formatados como texto apenas na exibição)
+    vendedor = np.random.randint(1, 21, n_registros, dtype=np.int16)
+    cliente = np.random.randint(1000, 9999, n_registros, dtype=np.int32)
+    
+    numero = pd.Series(np.arange(1, n_registros + 1)).astype(str)
+    produto = 'Produto ' + pd.Series(np.asarray(categorias)[idx_categoria]) + ' ' + numero
+    
+    # Colunas de texto como category, montadas direto dos índices sorteados
+    df = pd.DataFrame({
+        'Data': datas,
+        'Categoria': pd.Categorical.from_codes(idx_categoria, categorias),
+        'Produto': produto,
+        'Região': pd.Categorical.from_codes(idx_regiao, regioes),
+        'Cidade': pd.Categorical.from_codes(idx_cidade, todas_cidades),
+        'Valor_Unitário': valor,
+        'Quantidade': quantidade,
+        'Valor_Total': total,
+        'Desconto_%': desconto,
+        'Valor_Final': valor_final,
+        'Status': pd.Categorical.from_codes(idx_status, status),
+        'Método_Pagamento': pd.Categorical.from_codes(idx_metodo, metodos_pagamento),
+        'Vendedor_ID': vendedor,
+        'Cliente_ID_Num': cliente
+    })
+    
+    return df.astype(TIPOS_NUMERICOS)
+
+def remover_colunas_derivadas(df):
+    """
+    Remove as colunas derivadas de 'Data' gravadas no CSV legado
     
+    Mês, Ano, Trimestre etc. são recalculados pelo DataProcessor apenas
+    quando uma análise precisa deles.
+    """
+    return df.drop(columns=COLUNAS_DERIVADAS, errors='ignore')
+
+def converter_identificadores(df):
+    """
+    Converte identificadores em texto (formato antigo do CSV) para inteiros
+    
+    'Vendedor N' vira Vendedor_ID, 'CNNNN' vira Cliente_ID_Num e o ID
+    sequencial da venda é descartado (o índice do DataFrame cumpre esse papel).
+    """
+    if 'Vendedor' in df.columns:
+        vendedor = df.pop('Vendedor').astype(str).str.removeprefix('Vendedor ')
+        df['Vendedor_ID'] = vendedor.astype(np.int16)
+    if 'Cliente_ID' in df.columns:
+        cliente = df.pop('Cliente_ID').astype(str).str.removeprefix('C')
+        df['Cliente_ID_Num'] = cliente.astype(np.int32)
+    if 'ID' in df.columns:
+        df.pop('ID')
     return df
 
-def salvar_dados(df, caminho='data/vendas.csv'):
-    """Salva o DataFrame em CSV"""
+def formatar_identificadores(df):
+    """
+    Identificadores no formato de exibição (inverso de converter_identificadores)
+    
+    Aplicado apenas às linhas exibidas: Vendedor_ID volta a 'Vendedor N',
+    Cliente_ID_Num a 'CNNNN' e o índice vira o ID sequencial 'VNNNNN'.
+    """
+    df = df.rename(columns={'Vendedor_ID': 'Vendedor', 'Cliente_ID_Num': 'Cliente_ID'})
+    if 'Vendedor' in df.columns:
+        df['Vendedor'] = 'Vendedor ' + df['Vendedor'].astype(str)
+    if 'Cliente_ID' in df.columns:
+        df['Cliente_ID'] = 'C' + df['Cliente_ID'].astype(str)
+    df.index = [f'V{i + 1:05d}' for i in df.index]
+    return df.reset_index(names='ID')
+
+def salvar_dados(df, caminho='data/vendas.parquet'):
+    """
+    Salva o DataFrame em Parquet
+    
+    O formato colunar preserva os tipos (datas, category) e evita
+    reprocessar texto a cada carregamento.
+    
+    Args:
+        df: DataFrame a salvar
+        caminho: Caminho do arquivo (a extensão é trocada para .parquet)
+    
+    Returns:
+        Caminho do arquivo salvo
+    """
     import os
+    caminho = os.path.splitext(caminho)[0] + '.parquet'
     os.makedirs(os.path.dirname(caminho), exist_ok=True)
-    df.to_csv(caminho, index=False, encoding='utf-8-sig')
+    df.to_parquet(caminho, engine='pyarrow', compression='zstd', index=False)
     print(f"Dados salvos em {caminho}")
     return caminho
 
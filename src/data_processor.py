@@ -7,31 +7,169 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+try:
+    from .selecao import indices_maiores
+except ImportError:
+    from selecao import indices_maiores
+
+# Copy-on-Write: seleções compartilham memória até serem modificadas,
+# dispensando cópias defensivas (comportamento padrão a partir do pandas 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+# Nome do índice do resultado por código de período
+NOMES_PERIODO = {'D': 'Dia', 'W': 'Semana', 'M': 'Mês', 'Q': 'Ano_Trimestre'}
+
+# Períodos que podem ser truncados direto em datetime64, sem objetos Period
+UNIDADES_PERIODO = {'D': 'datetime64[D]', 'M': 'datetime64[M]'}
+
 class DataProcessor:
     """Classe para processamento avançado de dados"""
     
-    def __init__(self, df):
+    def __init__(self, df, datas_ordenadas=None):
         """
         Inicializa o processador com um DataFrame
         
+        Os filtros apenas registram o estado desejado; a seleção é feita
+        uma única vez, com uma máscara combinada, quando os dados são lidos.
+        
         Args:
             df: DataFrame do pandas
+            datas_ordenadas: True se 'Data' já está em ordem crescente
+                (None = verificar uma única vez, no primeiro filtro de período)
+        """
+        self.df_original = df
+        self._df_base = df
+        
+        # Remover linhas preserva a ordem, então o indicador vale também
+        # para a base limpa e para a restaurada por reset_filtros
+        self._datas_ordenadas = datas_ordenadas
+        
+        # Estado dos filtros (None = sem filtro)
+        self._data_inicio = None
+        self._data_fim = None
+        self._status = None
+        self._categorias = None
+        self._regioes = None
+        
+        self._cache = None
+        self._cache_concluida = None
+        self._cache_receita_mensal = None
+        self._cache_periodos = {}
+    
+    @property
+    def df(self):
+        """DataFrame com os filtros aplicados, materializado sob demanda"""
+        if self._cache is None:
+            self._cache = self._materializar()
+        return self._cache
+    
+    @property
+    def df_concluida(self):
+        """Vendas concluídas do DataFrame filtrado (calculado uma vez por estado dos filtros)"""
+        if self._cache_concluida is None:
+            df = self.df
+            self._cache_concluida = df[df['Status'] == 'Concluída']
+        return self._cache_concluida
+    
+    @property
+    def mes(self):
+        """Mês (datetime64[M]) de cada venda concluída"""
+        return self._chave_periodo('M')
+    
+    @property
+    def receita_mensal(self):
+        """Receita mensal das vendas concluídas (calculada uma vez por estado dos filtros)"""
+        if self._cache_receita_mensal is None:
+            self._cache_receita_mensal = self.df_concluida['Valor_Final'].groupby(self.mes).sum()
+        return self._cache_receita_mensal
+    
+    def _chave_periodo(self, periodo):
         """
-        self.df = df.copy()
-        self.df_original = df.copy()
+        Período de cada venda concluída, derivado de 'Data' sob demanda
+        
+        Dia e mês são truncados em datetime64; semana e trimestre usam Period.
+        O resultado fica em cache até a próxima mudança nos filtros.
+        """
+        if periodo not in self._cache_periodos:
+            datas = self.df_concluida['Data']
+            unidade = UNIDADES_PERIODO.get(periodo)
+            if unidade is not None:
+                chave = datas.to_numpy().astype(unidade)
+            else:
+                chave = datas.dt.to_period(periodo).array
+            self._cache_periodos[periodo] = chave
+        return self._cache_periodos[periodo]
+    
+    def _invalidar_cache(self):
+        """Descarta os resultados materializados após mudança nos filtros"""
+        self._cache = None
+        self._cache_concluida = None
+        self._cache_receita_mensal = None
+        self._cache_periodos = {}
+    
+    def _materializar(self):
+        """Aplica todos os filtros com uma única máscara booleana"""
+        df = self._df_base
+        mascara = None
+        
+        if 'Data' in df.columns and (self._data_inicio is not None or self._data_fim is not None):
+            datas = df['Data']
+            if self._datas_ordenadas is None:
+                # Verificado no original: ordem nele implica ordem na base limpa
+                self._datas_ordenadas = self.df_original['Data'].is_monotonic_increasing
+            if self._datas_ordenadas:
+                # Datas ordenadas: localizar o período por busca binária e fatiar, sem máscara
+                valores = datas.to_numpy()
+                inicio, fim = 0, len(valores)
+                if self._data_inicio is not None:
+                    inicio = valores.searchsorted(self._data_inicio.to_datetime64(), side='left')
+                if self._data_fim is not None:
+                    fim = valores.searchsorted(self._data_fim.to_datetime64(), side='right')
+                df = df.iloc[inicio:fim]
+            elif self._data_inicio is not None and self._data_fim is not None:
+                mascara = datas.between(self._data_inicio, self._data_fim).to_numpy()
+            elif self._data_inicio is not None:
+                mascara = (datas >= self._data_inicio).to_numpy()
+            else:
+                mascara = (datas <= self._data_fim).to_numpy()
+        
+        filtros = [
+            ('Status', self._status),
+            ('Categoria', self._categorias),
+            ('Região', self._regioes)
+        ]
+        for coluna, valores in filtros:
+            if valores is not None and coluna in df.columns:
+                mascara_coluna = df[coluna].isin(valores).to_numpy()
+                mascara = mascara_coluna if mascara is None else mascara & mascara_coluna
+        
+        if mascara is None:
+            return df
+        return df[mascara]
+    
+    @staticmethod
+    def _como_conjunto(valores):
+        """Normaliza o valor de um filtro para um set (None = sem filtro)"""
+        if not valores:
+            return None
+        if isinstance(valores, list):
+            return set(valores)
+        return {valores}
     
     def limpar_dados(self):
         """Remove duplicatas e valores nulos críticos"""
-        print(f"Registros antes da limpeza: {len(self.df)}")
+        print(f"Registros antes da limpeza: {len(self._df_base)}")
         
         # Remover duplicatas
-        self.df = self.df.drop_duplicates()
+        df = self._df_base.drop_duplicates()
         
         # Remover registros com valores críticos nulos
         colunas_criticas = ['Data', 'Valor_Final', 'Status']
-        self.df = self.df.dropna(subset=colunas_criticas)
+        self._df_base = df.dropna(subset=colunas_criticas)
+        self._invalidar_cache()
         
-        print(f"Registros após limpeza: {len(self.df)}")
+        print(f"Registros após limpeza: {len(self._df_base)}")
         return self
     
     def filtrar_por_periodo(self, data_inicio=None, data_fim=None):
@@ -42,51 +180,46 @@ class DataProcessor:
             data_inicio: Data inicial (datetime, date ou string)
             data_fim: Data final (datetime, date ou string)
         """
-        if 'Data' in self.df.columns:
-            if data_inicio:
-                # Converter para datetime usando pd.to_datetime que aceita date, datetime, string, etc.
-                data_inicio = pd.to_datetime(data_inicio)
-                self.df = self.df[self.df['Data'] >= data_inicio]
-            
-            if data_fim:
-                # Converter para datetime
-                data_fim = pd.to_datetime(data_fim)
-                # Adicionar 23:59:59.999 para incluir o dia inteiro
-                data_fim = data_fim + pd.Timedelta(days=1) - pd.Timedelta(milliseconds=1)
-                self.df = self.df[self.df['Data'] <= data_fim]
+        # pd.to_datetime aceita date, datetime, string, etc.
+        self._data_inicio = pd.to_datetime(data_inicio) if data_inicio else None
         
+        if data_fim:
+            # Adicionar 23:59:59.999 para incluir o dia inteiro
+            data_fim = pd.to_datetime(data_fim)
+            self._data_fim = data_fim + pd.Timedelta(days=1) - pd.Timedelta(milliseconds=1)
+        else:
+            self._data_fim = None
+        
+        self._invalidar_cache()
         return self
     
     def filtrar_por_status(self, status=None):
         """Filtra por status da venda"""
-        if status and 'Status' in self.df.columns:
-            if isinstance(status, list):
-                self.df = self.df[self.df['Status'].isin(status)]
-            else:
-                self.df = self.df[self.df['Status'] == status]
+        self._status = self._como_conjunto(status)
+        self._invalidar_cache()
         return self
     
     def filtrar_por_categoria(self, categorias=None):
         """Filtra por categorias"""
-        if categorias and 'Categoria' in self.df.columns:
-            if isinstance(categorias, list):
-                self.df = self.df[self.df['Categoria'].isin(categorias)]
-            else:
-                self.df = self.df[self.df['Categoria'] == categorias]
+        self._categorias = self._como_conjunto(categorias)
+        self._invalidar_cache()
         return self
     
     def filtrar_por_regiao(self, regioes=None):
         """Filtra por regiões"""
-        if regioes and 'Região' in self.df.columns:
-            if isinstance(regioes, list):
-                self.df = self.df[self.df['Região'].isin(regioes)]
-            else:
-                self.df = self.df[self.df['Região'] == regioes]
+        self._regioes = self._como_conjunto(regioes)
+        self._invalidar_cache()
         return self
     
     def reset_filtros(self):
         """Reseta todos os filtros"""
-        self.df = self.df_original.copy()
+        self._df_base = self.df_original
+        self._data_inicio = None
+        self._data_fim = None
+        self._status = None
+        self._categorias = None
+        self._regioes = None
+        self._invalidar_cache()
         return self
     
     def calcular_metricas_vendas(self):
@@ -96,7 +229,7 @@ class DataProcessor:
         Returns:
             dict com métricas calculadas
         """
-        df_vendas = self.df[self.df['Status'] == 'Concluída'].copy()
+        df_vendas = self.df_concluida
         
         if len(df_vendas) == 0:
             return {
@@ -129,36 +262,37 @@ class DataProcessor:
     
     def analise_por_categoria(self):
         """Análise agregada por categoria"""
-        df_vendas = self.df[self.df['Status'] == 'Concluída'].copy()
+        df_vendas = self.df_concluida
         
         if len(df_vendas) == 0:
             return pd.DataFrame()
         
-        analise = df_vendas.groupby('Categoria').agg({
-            'Valor_Final': ['sum', 'mean', 'count'],
-            'Quantidade': 'sum',
-            'Desconto_%': 'mean'
-        }).round(2)
+        analise = df_vendas.groupby('Categoria', observed=True, sort=False).agg(
+            Receita_Total=('Valor_Final', 'sum'),
+            Ticket_Medio=('Valor_Final', 'mean'),
+            Num_Vendas=('Valor_Final', 'count'),
+            Total_Produtos=('Quantidade', 'sum'),
+            Desconto_Medio=('Desconto_%', 'mean')
+        ).round(2)
         
-        analise.columns = ['Receita_Total', 'Ticket_Medio', 'Num_Vendas', 
-                          'Total_Produtos', 'Desconto_Medio']
         analise = analise.sort_values('Receita_Total', ascending=False)
         
         return analise
     
     def analise_por_regiao(self):
         """Análise agregada por região"""
-        df_vendas = self.df[self.df['Status'] == 'Concluída'].copy()
+        df_vendas = self.df_concluida
         
         if len(df_vendas) == 0:
             return pd.DataFrame()
         
-        analise = df_vendas.groupby('Região').agg({
-            'Valor_Final': ['sum', 'mean', 'count'],
-            'Cidade': 'nunique'
-        }).round(2)
+        analise = df_vendas.groupby('Região', observed=True, sort=False).agg(
+            Receita_Total=('Valor_Final', 'sum'),
+            Ticket_Medio=('Valor_Final', 'mean'),
+            Num_Vendas=('Valor_Final', 'count'),
+            Num_Cidades=('Cidade', 'nunique')
+        ).round(2)
         
-        analise.columns = ['Receita_Total', 'Ticket_Medio', 'Num_Vendas', 'Num_Cidades']
         analise = analise.sort_values('Receita_Total', ascending=False)
         
         return analise
@@ -170,51 +304,64 @@ class DataProcessor:
         Args:
             periodo: 'D' (dia), 'W' (semana), 'M' (mês), 'Q' (trimestre)
         """
-        df_vendas = self.df[self.df['Status'] == 'Concluída'].copy()
+        df_vendas = self.df_concluida
         
         if len(df_vendas) == 0:
             return pd.DataFrame()
         
-        df_vendas = df_vendas.set_index('Data')
-        
-        analise = df_vendas.resample(periodo).agg({
-            'Valor_Final': ['sum', 'mean', 'count'],
-            'Quantidade': 'sum'
+        grupos = df_vendas.groupby(self._chave_periodo(periodo))
+        somas = grupos[['Valor_Final', 'Quantidade']].sum()
+        analise = pd.DataFrame({
+            'Receita_Total': somas['Valor_Final'],
+            'Ticket_Medio': grupos['Valor_Final'].mean(),
+            'Num_Vendas': grupos['Valor_Final'].count(),
+            'Total_Produtos': somas['Quantidade']
         }).round(2)
         
-        analise.columns = ['Receita_Total', 'Ticket_Medio', 'Num_Vendas', 'Total_Produtos']
-        analise = analise.fillna(0)
+        # Índice como Period e inclusão dos períodos sem vendas
+        if not isinstance(analise.index, pd.PeriodIndex):
+            analise.index = analise.index.to_period(periodo)
+        indice = analise.index
+        analise = analise.reindex(pd.period_range(indice.min(), indice.max(), freq=indice.freq), fill_value=0)
+        analise.index.name = NOMES_PERIODO.get(periodo, 'Período')
         
         return analise
     
     def top_vendedores(self, n=10):
         """Retorna os top N vendedores"""
-        df_vendas = self.df[self.df['Status'] == 'Concluída'].copy()
+        df_vendas = self.df_concluida
         
         if len(df_vendas) == 0:
             return pd.DataFrame()
         
-        top = df_vendas.groupby('Vendedor').agg({
-            'Valor_Final': ['sum', 'mean', 'count']
+        grupos = df_vendas.groupby('Vendedor_ID', sort=False)['Valor_Final']
+        top = pd.DataFrame({
+            'Receita_Total': grupos.sum(),
+            'Ticket_Medio': grupos.mean(),
+            'Num_Vendas': grupos.count()
         }).round(2)
         
-        top.columns = ['Receita_Total', 'Ticket_Medio', 'Num_Vendas']
-        top = top.sort_values('Receita_Total', ascending=False).head(n)
+        top = top.iloc[indices_maiores(top['Receita_Total'].to_numpy(), n)]
+        
+        # Formatar o nome do vendedor apenas no resultado final
+        top.index = 'Vendedor ' + top.index.astype(str)
+        top.index.name = 'Vendedor'
         
         return top
     
     def analise_metodo_pagamento(self):
         """Análise por método de pagamento"""
-        df_vendas = self.df[self.df['Status'] == 'Concluída'].copy()
+        df_vendas = self.df_concluida
         
         if len(df_vendas) == 0:
             return pd.DataFrame()
         
-        analise = df_vendas.groupby('Método_Pagamento').agg({
-            'Valor_Final': ['sum', 'mean', 'count']
-        }).round(2)
+        analise = df_vendas.groupby('Método_Pagamento', observed=True, sort=False).agg(
+            Receita_Total=('Valor_Final', 'sum'),
+            Ticket_Medio=('Valor_Final', 'mean'),
+            Num_Transacoes=('Valor_Final', 'count')
+        ).round(2)
         
-        analise.columns = ['Receita_Total', 'Ticket_Medio', 'Num_Transacoes']
         analise['Percentual'] = (analise['Receita_Total'] / analise['Receita_Total'].sum() * 100).round(2)
         analise = analise.sort_values('Receita_Total', ascending=False)
         
@@ -222,14 +369,13 @@ class DataProcessor:
     
     def tendencias(self):
         """Calcula tendências e crescimento"""
-        df_vendas = self.df[self.df['Status'] == 'Concluída'].copy()
+        df_vendas = self.df_concluida
         
         if len(df_vendas) == 0:
             return {}
         
         # Análise mensal
-        df_vendas['Mês'] = df_vendas['Data'].dt.to_period('M')
-        df_mensal = df_vendas.groupby('Mês')['Valor_Final'].sum().sort_index()
+        df_mensal = self.receita_mensal
         
         if len(df_mensal) < 2:
             return {'crescimento_mensal': 0, 'tendencia': 'Insuficiente'}
@@ -255,5 +401,5 @@ class DataProcessor:
         }
     
     def get_dataframe(self):
-        """Retorna o DataFrame atual"""
-        return self.df.copy()
\ No newline at end of file
+        """Retorna o DataFrame atual (cópia rasa; com Copy-on-Write, os dados só são copiados se alterados)"""
+        return self.df.copy(deep=False)
@@ -0,0 +1,22 @@
+"""
+Módulo com rotinas de seleção compartilhadas pelo processamento e pelas visualizações
+"""
+
+import numpy as np
+
+def indices_maiores(valores, n):
+    """
+    Posições dos n maiores `valores`, em ordem decrescente
+    
+    Usa seleção parcial (np.argpartition) e ordena apenas as n posições
+    selecionadas, em vez de ordenar o array inteiro.
+    
+    Args:
+        valores: Array do NumPy
+        n: Quantidade de posições
+    """
+    if n < len(valores):
+        indices = np.argpartition(-valores, n)[:n]
+    else:
+        indices = np.arange(len(valores))
+    return indices[np.argsort(-valores[indices], kind='stable')]
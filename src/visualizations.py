@@ -1,44 +1,417 @@
 """
 Módulo para visualizações profissionais
-Utiliza matplotlib, seaborn e plotly para gráficos
+Utiliza plotly para gráficos
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+import functools
+import weakref
 
-# Configuração de estilo
-sns.set_style("whitegrid")
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+try:
+    from .selecao import indices_maiores
+except ImportError:
+    from selecao import indices_maiores
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # Laço serial sem GIL: kernels com parallel=True disparados da thread de
+    # script do Streamlit impedem o processo de encerrar (camada de threads TBB).
+    # Valores e somas em float64: os laços são limitados pelos acessos espalhados
+    # aos acumuladores, não pela leitura dos valores, e em float32 não ficam mais
+    # rápidos; já somas acima de ~1e7 perdem os centavos.
+    # Sem cache=True: o cache em disco guarda o nome do módulo que compilou
+    # ('visualizations' pelo app.py, 'src.visualizations' pelo pacote) e falha
+    # ao ser carregado pelo outro
+    @njit(nogil=True)
+    def _pivot_soma(codigos_linha, codigos_coluna, valores, n_linhas, n_colunas):
+        """Soma e contagem de `valores` por par de códigos (linha, coluna)"""
+        somas = np.zeros((n_linhas, n_colunas))
+        contagens = np.zeros((n_linhas, n_colunas), dtype=np.int64)
+        for i in range(len(valores)):
+            linha = codigos_linha[i]
+            coluna = codigos_coluna[i]
+            if linha < 0 or coluna < 0:
+                continue
+            contagens[linha, coluna] += 1
+            if not np.isnan(valores[i]):
+                somas[linha, coluna] += valores[i]
+        return somas, contagens
+    
+    @njit(nogil=True)
+    def _somas_fundidas(codigos, inicios, valores, total):
+        """
+        Soma e contagem de `valores` para vários agrupamentos numa única passada
+        
+        codigos[i, j] é o grupo da venda i no agrupamento j (-1 = nulo); os
+        resultados de cada agrupamento começam na posição inicios[j].
+        """
+        somas = np.zeros(total)
+        contagens = np.zeros(total, dtype=np.int64)
+        for i in range(codigos.shape[0]):
+            valor = valores[i]
+            somar = not np.isnan(valor)
+            for j in range(codigos.shape[1]):
+                codigo = codigos[i, j]
+                if codigo < 0:
+                    continue
+                contagens[inicios[j] + codigo] += 1
+                if somar:
+                    somas[inicios[j] + codigo] += valor
+        return somas, contagens
+else:
+    _pivot_soma = None
+    _somas_fundidas = None
+
+# Vendas concluídas e receitas agregadas por DataFrame (chave: id do DataFrame).
+# A entrada é descartada quando o DataFrame é coletado; os DataFrames recebidos
+# são tratados como somente leitura.
+_CACHE_VENDAS = {}
+
+def _mascara_concluida(df):
+    """Máscara booleana (NumPy) das vendas concluídas"""
+    status = df['Status']
+    if not isinstance(status.dtype, pd.CategoricalDtype):
+        return (status == 'Concluída').to_numpy()
+    # Status categórico: comparar o código inteiro em vez dos textos
+    categorias = status.cat.categories
+    if 'Concluída' not in categorias:
+        return np.zeros(len(status), dtype=bool)
+    return status.cat.codes.to_numpy() == categorias.get_loc('Concluída')
+
+class _VendasConcluidas:
+    """Vendas concluídas de um DataFrame, com receitas por coluna calculadas uma única vez"""
+    
+    def __init__(self, df):
+        self.df = df[_mascara_concluida(df)]
+        self.n_registros = len(df)
+        self._receitas = {}
+        self._codificacoes = {}
+        # Figuras prontas por (método, argumentos), ver _memorizar_figura
+        self.figuras = {}
+    
+    def receita_por(self, coluna):
+        """Soma de 'Valor_Final' agrupada por uma coluna"""
+        if coluna not in self._receitas:
+            self._receitas[coluna] = self._somar_por_codigo(coluna)
+        return self._receitas[coluna]
+    
+    def receitas_por(self, colunas):
+        """
+        Lista com receita_por(coluna) para cada coluna
+        
+        Com numba, as somas ainda não calculadas saem de uma única leitura de
+        'Valor_Final' (um kernel acumula todas as colunas no mesmo laço).
+        """
+        pendentes = [coluna for coluna in colunas if coluna not in self._receitas]
+        if _somas_fundidas is not None and len(pendentes) > 1:
+            codificacoes = [self._codigos(coluna) for coluna in pendentes]
+            tamanhos = np.array([tamanho for _, tamanho, _ in codificacoes], dtype=np.int64)
+            inicios = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+            # Uma linha por venda, uma coluna por agrupamento
+            codigos = np.column_stack([codigos for codigos, _, _ in codificacoes]).astype(np.int32)
+            somas, contagens = _somas_fundidas(
+                codigos, inicios, self.df['Valor_Final'].to_numpy(), int(tamanhos.sum())
+            )
+            for coluna, (_, tamanho, indice), inicio in zip(pendentes, codificacoes, inicios):
+                trecho = slice(inicio, inicio + tamanho)
+                self._receitas[coluna] = self._serie(somas[trecho], contagens[trecho], indice)
+        return [self.receita_por(coluna) for coluna in colunas]
+    
+    def _codigos(self, coluna):
+        """
+        Códigos de grupo (-1 = nulo), número de grupos e função que monta o índice do resultado
+        
+        Calculados uma única vez por coluna e compartilhados por todas as somas
+        (bincount e kernels numba). 'Mês_Ano' usa os meses de 'Data' contados a
+        partir do primeiro; colunas categóricas, seus códigos; inteiras não
+        negativas e densas, o próprio valor; as demais são fatoradas (pd.factorize).
+        """
+        if coluna not in self._codificacoes:
+            self._codificacoes[coluna] = self._codificar(coluna)
+        return self._codificacoes[coluna]
+    
+    def _codificar(self, coluna):
+        """Calcula a codificação de `coluna` (ver _codigos)"""
+        if coluna == 'Mês_Ano':
+            # Mês como inteiro via datetime64[M] (meses desde 1970), sem objetos Period
+            datas = self.df['Data'].to_numpy()
+            validas = ~np.isnat(datas)
+            meses = datas.astype('datetime64[M]').astype(np.int64)
+            inicio = meses[validas].min() if validas.any() else 0
+            codigos = np.where(validas, meses - inicio, -1)
+            tamanho = int(codigos.max()) + 1 if len(codigos) > 0 else 0
+            
+            def indice(observados):
+                meses = (observados + inicio).astype('datetime64[M]')
+                return pd.Index(np.datetime_as_string(meses, unit='M'), name=coluna)
+            return codigos, tamanho, indice
+        
+        serie = self.df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            def indice(observados):
+                return pd.CategoricalIndex(pd.Categorical.from_codes(observados, dtype=serie.dtype), name=coluna)
+            return serie.cat.codes.to_numpy(), len(serie.cat.categories), indice
+        
+        if pd.api.types.is_integer_dtype(serie.dtype) and len(serie) > 0 and serie.min() >= 0:
+            codigos = serie.to_numpy()
+            maximo = int(codigos.max())
+            # Os acumuladores têm max + 1 posições: o próprio valor só serve de
+            # código enquanto o maior ID for pequeno perto do número de linhas
+            if maximo < 4 * len(codigos) + 256:
+                def indice(observados):
+                    return pd.Index(observados.astype(serie.dtype), name=coluna)
+                return codigos, maximo + 1, indice
+        
+        # Texto, inteiros com negativos ou IDs esparsos: fatorar, com grupos em ordem como no groupby
+        codigos, unicos = pd.factorize(serie, sort=True)
+        
+        def indice(observados):
+            return pd.Index(unicos[observados], name=coluna)
+        return codigos, len(unicos), indice
+    
+    @staticmethod
+    def _serie(somas, contagens, indice):
+        """Monta a Series de receitas apenas com os grupos observados"""
+        observados = np.flatnonzero(contagens)
+        return pd.Series(somas[observados], index=indice(observados), name='Valor_Final')
+    
+    def _somar_por_codigo(self, coluna):
+        """
+        Soma de 'Valor_Final' por código de grupo, via np.bincount
+        
+        Equivale a groupby(coluna, observed=True).sum().
+        """
+        codigos, tamanho, indice = self._codigos(coluna)
+        
+        valores = self.df['Valor_Final'].to_numpy()
+        # Como no groupby: chaves nulas (código -1) e valores NaN não entram na soma
+        validos = codigos >= 0
+        if not validos.all():
+            codigos, valores = codigos[validos], valores[validos]
+        valores = np.nan_to_num(valores)
+        codigos = codigos.astype(np.intp)
+        
+        somas = np.bincount(codigos, weights=valores, minlength=tamanho)
+        contagens = np.bincount(codigos, minlength=tamanho)
+        return self._serie(somas, contagens, indice)
+    
+    def pivot_receita(self, linha, coluna):
+        """
+        Receita em tabela linha x coluna, como pivot_table(observed=True, fill_value=0)
+        
+        A soma é feita sobre os códigos das duas colunas (ver _codigos): por um
+        kernel numba, se disponível, ou por um np.bincount do código achatado
+        (linha * n_colunas + coluna).
+        """
+        chave = ('pivot', linha, coluna)
+        if chave not in self._receitas:
+            codigos_linha, n_linhas, indice_linha = self._codigos(linha)
+            codigos_coluna, n_colunas, indice_coluna = self._codigos(coluna)
+            valores = self.df['Valor_Final'].to_numpy()
+            
+            if _pivot_soma is not None:
+                somas, contagens = _pivot_soma(codigos_linha, codigos_coluna, valores, n_linhas, n_colunas)
+            else:
+                # Chaves nulas (código -1) e valores NaN ficam fora da soma, como no groupby
+                validos = (codigos_linha >= 0) & (codigos_coluna >= 0)
+                codigos = codigos_linha[validos].astype(np.intp) * n_colunas + codigos_coluna[validos]
+                tamanho = n_linhas * n_colunas
+                somas = np.bincount(codigos, weights=np.nan_to_num(valores[validos]), minlength=tamanho)
+                contagens = np.bincount(codigos, minlength=tamanho)
+                somas = somas.reshape(n_linhas, n_colunas)
+                contagens = contagens.reshape(n_linhas, n_colunas)
+            
+            linhas = np.flatnonzero(contagens.sum(axis=1))
+            colunas = np.flatnonzero(contagens.sum(axis=0))
+            self._receitas[chave] = pd.DataFrame(
+                somas[np.ix_(linhas, colunas)],
+                index=indice_linha(linhas),
+                columns=indice_coluna(colunas)
+            )
+        return self._receitas[chave]
+    
+    def receita_mensal(self):
+        """Soma de 'Valor_Final' por mês, indexada por rótulos 'AAAA-MM' (apenas meses com vendas)"""
+        return self.receita_por('Mês_Ano')
+
+def _vendas_concluidas(df):
+    """Retorna as vendas concluídas de `df`, reaproveitando o resultado entre gráficos"""
+    chave = id(df)
+    vendas = _CACHE_VENDAS.get(chave)
+    if vendas is not None and vendas.n_registros != len(df):
+        # DataFrame alterado no lugar desde o cálculo: descartar os resultados
+        vendas = _CACHE_VENDAS[chave] = _VendasConcluidas(df)
+    if vendas is None:
+        vendas = _VendasConcluidas(df)
+        _CACHE_VENDAS[chave] = vendas
+        weakref.finalize(df, _CACHE_VENDAS.pop, chave, None)
+    return vendas
+
+def _memorizar_figura(metodo):
+    """
+    Reaproveita a figura já construída para o mesmo DataFrame e argumentos
+    
+    As figuras ficam no cache de vendas do DataFrame (mesma chave id(df) e
+    mesmo descarte) e são compartilhadas entre chamadas: não devem ser
+    alteradas por quem as recebe.
+    """
+    @functools.wraps(metodo)
+    def envoltorio(df, *args, **kwargs):
+        figuras = _vendas_concluidas(df).figuras
+        chave = (metodo.__name__, args, tuple(sorted(kwargs.items())))
+        if chave not in figuras:
+            figuras[chave] = metodo(df, *args, **kwargs)
+        return figuras[chave]
+    return envoltorio
+
+def _contagens(serie):
+    """
+    Contagem de registros por valor, em ordem decrescente e sem valores ausentes
+    
+    Em colunas categóricas conta os códigos com np.bincount, sem a tabela hash
+    do value_counts().
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        contagem = serie.value_counts()
+        return contagem[contagem > 0]
+    
+    codigos = serie.cat.codes.to_numpy()
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(serie.cat.categories))
+    ordem = np.argsort(-contagens, kind='stable')
+    ordem = ordem[contagens[ordem] > 0]
+    return pd.Series(contagens[ordem], index=serie.cat.categories[ordem], name='count')
+
+def _lttb(x, y, n_saida):
+    """
+    Índices dos pontos escolhidos pelo Largest-Triangle-Three-Buckets
+    
+    Mantém o primeiro e o último ponto e, em cada balde intermediário, o ponto
+    que forma o maior triângulo com o ponto anterior escolhido e a média do
+    balde seguinte, preservando picos e vales da série.
+    """
+    n = len(y)
+    if n_saida >= n or n_saida < 3:
+        return np.arange(n)
+    
+    limites = np.linspace(1, n - 1, n_saida - 1).astype(np.int64)
+    indices = np.empty(n_saida, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    
+    anterior = 0
+    for i in range(n_saida - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        proximo_fim = limites[i + 2] if i + 2 < len(limites) else n
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+    return indices
+
+def _figura_vazia(titulo, altura=400, aviso='Nenhuma venda concluída nos filtros selecionados'):
+    """Figura apenas com título e aviso, para quando não há vendas a exibir"""
+    fig = go.Figure()
+    fig.add_annotation(
+        text=aviso,
+        xref='paper', yref='paper', x=0.5, y=0.5, showarrow=False
+    )
+    fig.update_layout(
+        title=titulo,
+        template='plotly_white',
+        height=altura,
+        xaxis={'visible': False},
+        yaxis={'visible': False}
+    )
+    return fig
+
+# Figura do dashboard completo sem dados, montada na primeira chamada
+_ESQUELETO_DASHBOARD = None
+
+def _esqueleto_dashboard():
+    """Subplots, títulos, estilo e os quatro traces vazios do dashboard completo"""
+    global _ESQUELETO_DASHBOARD
+    if _ESQUELETO_DASHBOARD is None:
+        fig = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=('Receita por Categoria', 'Receita por Região', 
+                          'Vendas Mensais', 'Top 5 Vendedores'),
+            specs=[[{"type": "bar"}, {"type": "bar"}],
+                   [{"type": "scatter"}, {"type": "bar"}]]
+        )
+        fig.add_trace(go.Bar(orientation='h', name='Categoria'), row=1, col=1)
+        fig.add_trace(go.Bar(name='Região'), row=1, col=2)
+        fig.add_trace(go.Scattergl(mode='lines+markers', name='Mensal'), row=2, col=1)
+        fig.add_trace(go.Bar(name='Vendedores'), row=2, col=2)
+        fig.update_layout(
+            height=800,
+            title_text="Dashboard Completo de Vendas",
+            template='plotly_white',
+            showlegend=False
+        )
+        _ESQUELETO_DASHBOARD = fig
+    return _ESQUELETO_DASHBOARD
 
 class Visualizations:
     """Classe para criar visualizações profissionais"""
     
+    # Colunas de agrupamento convertidas para category por preparar()
+    COLUNAS_CATEGORICAS = ['Status', 'Categoria', 'Região', 'Método_Pagamento']
+    
+    @classmethod
+    def preparar(cls, df):
+        """
+        Converte as colunas de agrupamento para category
+        
+        Com 'Status' categórico, a seleção das vendas concluídas compara códigos
+        inteiros. Se nada precisar de conversão, o próprio df é retornado.
+        """
+        convertidas = {
+            coluna: df[coluna].astype('category')
+            for coluna in cls.COLUNAS_CATEGORICAS
+            if coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype)
+        }
+        return df.assign(**convertidas) if convertidas else df
+    
     @staticmethod
-    def grafico_receita_temporal(df, periodo='M'):
+    @_memorizar_figura
+    def grafico_receita_temporal(df, periodo='M', max_pontos=2000):
         """
         Gráfico de linha mostrando receita ao longo do tempo
         
         Args:
             df: DataFrame com coluna 'Data' e 'Valor_Final'
             periodo: Período de agregação ('D', 'W', 'M')
+            max_pontos: Acima disso, a série é reduzida por LTTB antes do gráfico
         """
-        df_vendas = df[df['Status'] == 'Concluída'].copy()
-        df_vendas = df_vendas.set_index('Data')
+        df_vendas = _vendas_concluidas(df).df
+        receita_temporal = df_vendas.set_index('Data')['Valor_Final'].resample(periodo).sum()
+        
+        if len(receita_temporal) > max_pontos:
+            posicoes = receita_temporal.index.asi8
+            posicoes = (posicoes - posicoes[0]).astype(np.float64)
+            receita_temporal = receita_temporal.iloc[_lttb(posicoes, receita_temporal.to_numpy(), max_pontos)]
         
-        receita_temporal = df_vendas.resample(periodo)['Valor_Final'].sum()
+        if len(receita_temporal) == 0:
+            return _figura_vazia('Receita ao Longo do Tempo')
         
         fig = px.line(
-            x=receita_temporal.index,
+            x=receita_temporal.index.to_numpy(),
             y=receita_temporal.values,
             title='Receita ao Longo do Tempo',
             labels={'x': 'Período', 'y': 'Receita (R$)'},
-            markers=True
+            markers=True,
+            render_mode='webgl'
         )
         
         fig.update_layout(
@@ -52,15 +425,17 @@ class Visualizations:
         return fig
     
     @staticmethod
+    @_memorizar_figura
     def grafico_receita_por_categoria(df):
         """Gráfico de barras horizontal com receita por categoria"""
-        df_vendas = df[df['Status'] == 'Concluída'].copy()
+        receita_categoria = _vendas_concluidas(df).receita_por('Categoria').sort_values(ascending=True)
         
-        receita_categoria = df_vendas.groupby('Categoria')['Valor_Final'].sum().sort_values(ascending=True)
+        if len(receita_categoria) == 0:
+            return _figura_vazia('Receita por Categoria')
         
         fig = px.bar(
             x=receita_categoria.values,
-            y=receita_categoria.index,
+            y=receita_categoria.index.tolist(),
             orientation='h',
             title='Receita por Categoria',
             labels={'x': 'Receita (R$)', 'y': 'Categoria'},
@@ -79,15 +454,17 @@ class Visualizations:
         return fig
     
     @staticmethod
+    @_memorizar_figura
     def grafico_pizza_categorias(df):
         """Gráfico de pizza mostrando distribuição por categoria"""
-        df_vendas = df[df['Status'] == 'Concluída'].copy()
+        receita_categoria = _vendas_concluidas(df).receita_por('Categoria')
         
-        receita_categoria = df_vendas.groupby('Categoria')['Valor_Final'].sum()
+        if len(receita_categoria) == 0:
+            return _figura_vazia('Distribuição de Receita por Categoria')
         
         fig = px.pie(
             values=receita_categoria.values,
-            names=receita_categoria.index,
+            names=receita_categoria.index.tolist(),
             title='Distribuição de Receita por Categoria',
             hole=0.4
         )
@@ -98,14 +475,16 @@ class Visualizations:
         return fig
     
     @staticmethod
+    @_memorizar_figura
     def grafico_receita_por_regiao(df):
         """Gráfico de barras com receita por região"""
-        df_vendas = df[df['Status'] == 'Concluída'].copy()
+        receita_regiao = _vendas_concluidas(df).receita_por('Região').sort_values(ascending=False)
         
-        receita_regiao = df_vendas.groupby('Região')['Valor_Final'].sum().sort_values(ascending=False)
+        if len(receita_regiao) == 0:
+            return _figura_vazia('Receita por Região')
         
         fig = px.bar(
-            x=receita_regiao.index,
+            x=receita_regiao.index.tolist(),
             y=receita_regiao.values,
             title='Receita por Região',
             labels={'x': 'Região', 'y': 'Receita (R$)'},
@@ -124,23 +503,19 @@ class Visualizations:
         return fig
     
     @staticmethod
+    @_memorizar_figura
     def mapa_calor_vendas(df):
         """Mapa de calor mostrando vendas por categoria e região"""
-        df_vendas = df[df['Status'] == 'Concluída'].copy()
-        
-        pivot = df_vendas.pivot_table(
-            values='Valor_Final',
-            index='Categoria',
-            columns='Região',
-            aggfunc='sum',
-            fill_value=0
-        )
+        pivot = _vendas_concluidas(df).pivot_receita('Categoria', 'Região')
+        
+        if pivot.size == 0:
+            return _figura_vazia('Mapa de Calor: Receita por Categoria e Região', altura=500)
         
         fig = px.imshow(
             pivot.values,
             labels=dict(x="Região", y="Categoria", color="Receita (R$)"),
-            x=pivot.columns,
-            y=pivot.index,
+            x=pivot.columns.tolist(),
+            y=pivot.index.tolist(),
             title='Mapa de Calor: Receita por Categoria e Região',
             color_continuous_scale='YlOrRd',
             aspect="auto"
@@ -151,12 +526,17 @@ class Visualizations:
         return fig
     
     @staticmethod
+    @_memorizar_figura
     def grafico_vendas_por_status(df):
         """Gráfico de barras mostrando vendas por status"""
-        status_count = df['Status'].value_counts()
+        status_count = _contagens(df['Status'])
+        
+        if len(status_count) == 0:
+            return _figura_vazia('Vendas por Status', altura=350,
+                                 aviso='Nenhuma venda nos filtros selecionados')
         
         fig = px.bar(
-            x=status_count.index,
+            x=status_count.index.tolist(),
             y=status_count.values,
             title='Vendas por Status',
             labels={'x': 'Status', 'y': 'Quantidade'},
@@ -175,15 +555,17 @@ class Visualizations:
         return fig
     
     @staticmethod
+    @_memorizar_figura
     def grafico_metodo_pagamento(df):
         """Gráfico de pizza mostrando métodos de pagamento"""
-        df_vendas = df[df['Status'] == 'Concluída'].copy()
+        metodo_count = _contagens(_vendas_concluidas(df).df['Método_Pagamento'])
         
-        metodo_count = df_vendas['Método_Pagamento'].value_counts()
+        if len(metodo_count) == 0:
+            return _figura_vazia('Distribuição por Método de Pagamento')
         
         fig = px.pie(
             values=metodo_count.values,
-            names=metodo_count.index,
+            names=metodo_count.index.tolist(),
             title='Distribuição por Método de Pagamento',
             hole=0.3
         )
@@ -194,14 +576,19 @@ class Visualizations:
         return fig
     
     @staticmethod
+    @_memorizar_figura
     def grafico_top_vendedores(df, n=10):
         """Gráfico de barras com top vendedores"""
-        df_vendas = df[df['Status'] == 'Concluída'].copy()
+        receita_vendedor = _vendas_concluidas(df).receita_por('Vendedor_ID')
+        top_vendedores = receita_vendedor.iloc[indices_maiores(receita_vendedor.to_numpy(), n)]
+        
+        if len(top_vendedores) == 0:
+            return _figura_vazia(f'Top {n} Vendedores')
         
-        top_vendedores = df_vendas.groupby('Vendedor')['Valor_Final'].sum().sort_values(ascending=False).head(n)
+        top_vendedores.index = 'Vendedor ' + top_vendedores.index.astype(str)
         
         fig = px.bar(
-            x=top_vendedores.index,
+            x=top_vendedores.index.tolist(),
             y=top_vendedores.values,
             title=f'Top {n} Vendedores',
             labels={'x': 'Vendedor', 'y': 'Receita (R$)'},
@@ -221,17 +608,18 @@ class Visualizations:
         return fig
     
     @staticmethod
+    @_memorizar_figura
     def grafico_tendencia_mensal(df):
         """Gráfico de linha mostrando tendência mensal"""
-        df_vendas = df[df['Status'] == 'Concluída'].copy()
+        receita_mensal = _vendas_concluidas(df).receita_mensal()
         
-        df_vendas['Mês_Ano'] = df_vendas['Data'].dt.to_period('M')
-        receita_mensal = df_vendas.groupby('Mês_Ano')['Valor_Final'].sum()
+        if len(receita_mensal) == 0:
+            return _figura_vazia('Tendência de Receita Mensal')
         
         fig = go.Figure()
         
-        fig.add_trace(go.Scatter(
-            x=receita_mensal.index.astype(str),
+        fig.add_trace(go.Scattergl(
+            x=receita_mensal.index.tolist(),
             y=receita_mensal.values,
             mode='lines+markers',
             name='Receita',
@@ -241,11 +629,14 @@ class Visualizations:
         
         # Adicionar linha de tendência
         if len(receita_mensal) > 1:
-            z = np.polyfit(range(len(receita_mensal)), receita_mensal.values, 1)
-            p = np.poly1d(z)
-            fig.add_trace(go.Scatter(
-                x=receita_mensal.index.astype(str),
-                y=p(range(len(receita_mensal))),
+            # Mínimos quadrados de grau 1 em forma fechada (sem SVD do polyfit)
+            y = receita_mensal.to_numpy()
+            x = np.arange(len(y), dtype=np.float64)
+            dx = x - x.mean()
+            inclinacao = (dx * (y - y.mean())).sum() / (dx * dx).sum()
+            fig.add_trace(go.Scattergl(
+                x=receita_mensal.index.tolist(),
+                y=inclinacao * dx + y.mean(),
                 mode='lines',
                 name='Tendência',
                 line=dict(color='red', width=2, dash='dash')
@@ -263,54 +654,38 @@ class Visualizations:
         return fig
     
     @staticmethod
+    @_memorizar_figura
     def dashboard_completo(df):
         """Cria um dashboard completo com múltiplos gráficos"""
-        df_vendas = df[df['Status'] == 'Concluída'].copy()
+        vendas = _vendas_concluidas(df)
         
-        # Criar subplots
-        fig = make_subplots(
-            rows=2, cols=2,
-            subplot_titles=('Receita por Categoria', 'Receita por Região', 
-                          'Vendas Mensais', 'Top 5 Vendedores'),
-            specs=[[{"type": "bar"}, {"type": "bar"}],
-                   [{"type": "scatter"}, {"type": "bar"}]]
+        # Cópia do esqueleto (subplots e estilo prontos); só os dados dos traces mudam
+        fig = go.Figure(_esqueleto_dashboard())
+        categoria, regiao, mensal, vendedores = fig.data
+        
+        # Receitas dos quatro painéis numa única passada pelos dados
+        receita_cat, receita_reg, receita_mensal, receita_vend = vendas.receitas_por(
+            ['Categoria', 'Região', 'Mês_Ano', 'Vendedor_ID']
         )
         
         # Receita por categoria
-        receita_cat = df_vendas.groupby('Categoria')['Valor_Final'].sum().sort_values(ascending=True)
-        fig.add_trace(
-            go.Bar(x=receita_cat.values, y=receita_cat.index, orientation='h', name='Categoria'),
-            row=1, col=1
-        )
+        receita_cat = receita_cat.sort_values(ascending=True)
+        categoria.x, categoria.y = receita_cat.values, receita_cat.index.tolist()
         
         # Receita por região
-        receita_reg = df_vendas.groupby('Região')['Valor_Final'].sum()
-        fig.add_trace(
-            go.Bar(x=receita_reg.index, y=receita_reg.values, name='Região'),
-            row=1, col=2
-        )
+        regiao.x, regiao.y = receita_reg.index.tolist(), receita_reg.values
         
         # Vendas mensais
-        df_vendas['Mês_Ano'] = df_vendas['Data'].dt.to_period('M')
-        receita_mensal = df_vendas.groupby('Mês_Ano')['Valor_Final'].sum()
-        fig.add_trace(
-            go.Scatter(x=receita_mensal.index.astype(str), y=receita_mensal.values, 
-                      mode='lines+markers', name='Mensal'),
-            row=2, col=1
-        )
+        mensal.x, mensal.y = receita_mensal.index.tolist(), receita_mensal.values
         
         # Top vendedores
-        top_vend = df_vendas.groupby('Vendedor')['Valor_Final'].sum().sort_values(ascending=False).head(5)
-        fig.add_trace(
-            go.Bar(x=top_vend.index, y=top_vend.values, name='Vendedores'),
-            row=2, col=2
-        )
+        top_vend = receita_vend.iloc[indices_maiores(receita_vend.to_numpy(), 5)]
+        top_vend.index = 'Vendedor ' + top_vend.index.astype(str)
+        vendedores.x, vendedores.y = top_vend.index.tolist(), top_vend.values
         
-        fig.update_layout(
-            height=800,
-            title_text="Dashboard Completo de Vendas",
-            template='plotly_white',
-            showlegend=False
-        )
-        
-        return fig
\ No newline at end of file
+        return fig
+
+if njit is not None:
+    # Compila os kernels na importação, para o primeiro render não pagar a compilação
+    _pivot_soma(np.zeros(1, dtype=np.int8), np.zeros(1, dtype=np.int8), np.zeros(1), 1, 1)
+    _somas_fundidas(np.zeros((1, 1), dtype=np.int32), np.zeros(1, dtype=np.int64), np.zeros(1), 1)